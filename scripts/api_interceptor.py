@@ -11,13 +11,20 @@ Requirements:
 """
 
 import argparse
+import functools
 import json
 import os
+import queue
+import re
 import sys
-from datetime import datetime
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, is_dataclass
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
-from urllib.parse import urlparse
+from urllib.parse import parse_qsl, urlparse
 
 try:
     from mitmproxy import http, ctx
@@ -26,33 +33,169 @@ except ImportError:
     print("Error: mitmproxy not installed. Run: pip install mitmproxy")
     sys.exit(1)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # fall back to stdlib json
+
+# Most recent raw traces kept in memory; the full stream lives in the
+# JSONL sidecar, so the aggregate file stays bounded regardless of session length
+MAX_STORED_REQUESTS = 1000
+
+# Per-second cache for the UTC timestamp string; "last_seen" doesn't need
+# sub-second precision, so high-RPS captures skip the datetime formatting
+_ts_cache: list[Any] = [0, ""]
+
+
+def utc_timestamp() -> str:
+    """ISO-8601 UTC timestamp at second granularity (cached per second)"""
+    ts_int = int(time.time())
+    if ts_int != _ts_cache[0]:
+        _ts_cache[0] = ts_int
+        _ts_cache[1] = datetime.fromtimestamp(ts_int, tz=timezone.utc).isoformat()
+    return _ts_cache[1]
+
+
+@dataclass(slots=True)
+class EndpointEntry:
+    """Aggregated view of one unique endpoint; slotted, so thousands of
+    distinct endpoints cost a fraction of the equivalent per-entry dicts"""
+
+    method: str
+    path: str
+    query_params: dict[str, Any]
+    request_body_example: Any
+    response_status: int | None
+    response_body_example: str | None
+    last_seen: str
+
+
+# Unique endpoints keyed by (category, "METHOD path"); grouped into the
+# nested JSON shape only at save time
+endpoint_entries: dict[tuple[str, str], EndpointEntry] = {}
+
 # Storage for captured endpoints
 captured_endpoints: dict[str, Any] = {
-    "captured_at": datetime.now().isoformat(),
+    "captured_at": utc_timestamp(),
     "base_url": "https://www.aura.build",
-    "endpoints": {},
+    "endpoints": {},  # built from endpoint_entries when saving
     "auth": {
         "method": None,
         "token_header": None,
         "sample_token": None,
     },
-    "requests": [],
+    "requests": deque(maxlen=MAX_STORED_REQUESTS),
 }
 
-# Target domains
-TARGET_DOMAINS = [
-    "aura.build",
-    "api.aura.build",
-]
+# Static-asset suffixes skipped by the response hook
+STATIC_SUFFIXES = (
+    ".js", ".css", ".png", ".jpg", ".svg", ".woff", ".woff2", ".gif", ".ico", ".map",
+)
 
 # Output file
 OUTPUT_FILE = "api_endpoints.json"
 
+# How long the writer thread batches queued traces before touching disk
+WRITE_BATCH_SECS = 0.5
+
+# Largest response body we fully parse/store; bigger ones keep size metadata only
+MAX_BODY_BYTES = 256 * 1024
+
+# Headers worth keeping in the capture, O(1) membership checks
+REQUEST_HEADER_ALLOWLIST = frozenset({"content-type", "authorization", "x-api-key", "accept"})
+RESPONSE_HEADER_ALLOWLIST = frozenset({"content-type", "set-cookie"})
+
+
+def json_loads(data: bytes) -> Any:
+    """Parse JSON bytes (orjson takes bytes directly, skipping the UTF-8 decode)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def _json_default(obj: Any) -> Any:
+    """Stdlib-json fallback for types orjson handles natively (dataclasses)"""
+    if is_dataclass(obj):
+        return asdict(obj)
+    return str(obj)
+
+
+def json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0, default=str)
+    return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode("utf-8")
+
+
+def content_type_of(headers: Any) -> str:
+    """Normalized media type from a Headers multidict ('' when absent)"""
+    return headers.get("content-type", "").split(";", 1)[0].strip().lower()
+
 
-def is_target_request(url: str) -> bool:
-    """Check if request is to aura.build domain"""
-    parsed = urlparse(url)
-    return any(domain in parsed.netloc for domain in TARGET_DOMAINS)
+def is_json_type(content_type: str) -> bool:
+    """True for application/json, application/ld+json and any +json type"""
+    return content_type in ("application/json", "application/ld+json") or content_type.endswith("+json")
+
+
+try:
+    # Hot-path matchers live in interceptor_fast so they can be AOT-compiled
+    # with mypyc/Cython; the plain-Python import works without any build step
+    from interceptor_fast import categorize_endpoint, is_target_request
+except ImportError:
+    # Fallback so the script still runs when copied around without its sibling
+    _TARGET_RE = re.compile(r"^https?://(?:[^/]*\.)?aura\.build(?::\d+)?(?:/|$)")
+    _CATEGORY_RE = re.compile(
+        r"/(auth|login|token|project|generate|ai|export|download"
+        r"|asset|upload|image|template|component|user|account)",
+        re.IGNORECASE,
+    )
+    _CATEGORY_MAP = {
+        "auth": "auth",
+        "login": "auth",
+        "token": "auth",
+        "project": "projects",
+        "generate": "generation",
+        "ai": "generation",
+        "export": "export",
+        "download": "export",
+        "asset": "assets",
+        "upload": "assets",
+        "image": "assets",
+        "template": "templates",
+        "component": "components",
+        "user": "users",
+        "account": "users",
+    }
+
+    def is_target_request(url: str) -> bool:
+        """Check if request is to aura.build domain"""
+        return _TARGET_RE.match(url) is not None
+
+    @functools.lru_cache(maxsize=4096)
+    def categorize_endpoint(path: str, method: str) -> str:
+        """Categorize endpoint based on path pattern"""
+        match = _CATEGORY_RE.search(path)
+        return _CATEGORY_MAP[match.group(1).lower()] if match else "other"
+
+
+# Set after the sample token has been recorded; the auth info is idempotent,
+# so every flow after the first can skip the header parse entirely
+_auth_captured = False
+
+
+def _maybe_capture_auth(headers: Any) -> None:
+    """Record the auth scheme and a sample token once, then become a no-op"""
+    global _auth_captured
+    if _auth_captured:
+        return
+    auth_header = headers.get("authorization", "")
+    if not auth_header:
+        return
+    captured_endpoints["auth"]["method"] = "Bearer" if "Bearer" in auth_header else "Unknown"
+    captured_endpoints["auth"]["token_header"] = "Authorization"
+    if "Bearer" in auth_header:
+        captured_endpoints["auth"]["sample_token"] = auth_header.split(" ")[-1][:20] + "..."
+    _auth_captured = True
 
 
 def extract_endpoint_info(flow: http.HTTPFlow) -> dict[str, Any]:
@@ -65,81 +208,115 @@ def extract_endpoint_info(flow: http.HTTPFlow) -> dict[str, Any]:
     path = parsed.path
 
     # Extract request body
+    # Dispatch on Content-Type up front: no exception-driven probing, and
+    # binary uploads are never UTF-8 decoded
     request_body = None
     if request.content:
-        try:
-            request_body = json.loads(request.content.decode("utf-8"))
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            request_body = request.content.decode("utf-8", errors="replace")
+        req_type = content_type_of(request.headers)
+        if is_json_type(req_type):
+            try:
+                request_body = json_loads(request.content)
+            except (ValueError, UnicodeDecodeError):
+                request_body = request.content.decode("utf-8", errors="replace")
+        elif req_type == "application/x-www-form-urlencoded":
+            request_body = dict(parse_qsl(request.content.decode("utf-8", errors="replace")))
+        else:
+            request_body = {"_binary": True, "size": len(request.content), "content_type": req_type}
 
     # Extract response body
     response_body = None
     if response and response.content:
-        try:
-            response_body = json.loads(response.content.decode("utf-8"))
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            response_body = response.content.decode("utf-8", errors="replace")[:500]
-
-    # Extract authentication info
-    auth_header = dict(request.headers).get("authorization", "")
-    if auth_header:
-        captured_endpoints["auth"]["method"] = "Bearer" if "Bearer" in auth_header else "Unknown"
-        captured_endpoints["auth"]["token_header"] = "Authorization"
-        if "Bearer" in auth_header:
-            captured_endpoints["auth"]["sample_token"] = auth_header.split(" ")[-1][:20] + "..."
+        if len(response.content) >= MAX_BODY_BYTES:
+            response_body = {"truncated": True, "size": len(response.raw_content or response.content)}
+        elif is_json_type(content_type_of(response.headers)):
+            try:
+                response_body = json_loads(response.content)
+            except (ValueError, UnicodeDecodeError):
+                response_body = response.content[:512].decode("utf-8", errors="replace")
+        else:
+            # Slice bytes before decoding so we never decode the whole body
+            response_body = response.content[:512].decode("utf-8", errors="replace")
+
+    # Extract authentication info (first flow carrying it only)
+    _maybe_capture_auth(request.headers)
 
     return {
-        "method": request.method,
+        # Methods come from a handful of constants; interning keeps dict keys cheap
+        "method": sys.intern(request.method),
         "path": path,
         "full_url": request.pretty_url,
         "query_params": dict(request.query or {}),
+        # Iterate the multidict directly instead of building a full dict just
+        # to keep a few keys
         "request_headers": {
-            k: v for k, v in dict(request.headers).items()
-            if k.lower() in ["content-type", "authorization", "x-api-key", "accept"]
+            k: v for k, v in request.headers.items()
+            if k.lower() in REQUEST_HEADER_ALLOWLIST
         },
         "request_body": request_body,
         "response_status": response.status_code if response else None,
         "response_headers": {
-            k: v for k, v in dict(response.headers).items()
-            if k.lower() in ["content-type", "set-cookie"]
+            k: v for k, v in response.headers.items()
+            if k.lower() in RESPONSE_HEADER_ALLOWLIST
         } if response else None,
         "response_body_preview": (
             str(response_body)[:500] if response_body else None
         ),
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": utc_timestamp(),
     }
 
 
-def categorize_endpoint(path: str, method: str) -> str:
-    """Categorize endpoint based on path pattern"""
-    path_lower = path.lower()
-
-    if "/auth" in path_lower or "/login" in path_lower or "/token" in path_lower:
-        return "auth"
-    elif "/project" in path_lower:
-        return "projects"
-    elif "/generate" in path_lower or "/ai" in path_lower:
-        return "generation"
-    elif "/export" in path_lower or "/download" in path_lower:
-        return "export"
-    elif "/asset" in path_lower or "/upload" in path_lower or "/image" in path_lower:
-        return "assets"
-    elif "/template" in path_lower:
-        return "templates"
-    elif "/component" in path_lower:
-        return "components"
-    elif "/user" in path_lower or "/account" in path_lower:
-        return "users"
-    else:
-        return "other"
-
-
 class AuraInterceptor:
     """mitmproxy addon for capturing Aura.build API calls"""
 
+    # Sentinel telling the writer thread to drain and exit
+    _STOP: Any = object()
+
     def __init__(self, output_file: str):
         self.output_file = output_file
+        base = output_file[:-5] if output_file.endswith(".json") else output_file
+        self.requests_file = base + ".requests.jsonl"
         self.request_count = 0
+        # (method, path) -> (category, endpoint_key); real traffic repeats the
+        # same few endpoints thousands of times, so hits are the common case
+        self._key_cache: dict[tuple[str, str], tuple[str, str]] = {}
+        # All serialization and disk I/O happens on this thread, so the
+        # response hook (and with it the proxy's event loop) never blocks
+        self._lock = threading.Lock()
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+
+    def _writer_loop(self) -> None:
+        """Consume queued traces, batching briefly between disk writes"""
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + WRITE_BATCH_SECS
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    break
+                batch.append(item)
+            with open(self.requests_file, "ab") as f:
+                for info in batch:
+                    f.write(json_dumps(info) + b"\n")
+            self.save()
+            if item is self._STOP:
+                return
+
+    def done(self) -> None:
+        """Drain the writer thread, then do the final pretty save on shutdown"""
+        self._queue.put(self._STOP)
+        self._writer.join(timeout=5.0)
+        self.save(pretty=True)
 
     def response(self, flow: http.HTTPFlow) -> None:
         """Called when a response is received"""
@@ -147,52 +324,81 @@ class AuraInterceptor:
             return
 
         # Skip static assets
-        if any(ext in flow.request.path for ext in [".js", ".css", ".png", ".jpg", ".svg", ".woff"]):
+        if flow.request.path.split("?", 1)[0].endswith(STATIC_SUFFIXES):
             return
 
         self.request_count += 1
         endpoint_info = extract_endpoint_info(flow)
 
         # Categorize and store
-        category = categorize_endpoint(endpoint_info["path"], endpoint_info["method"])
-        endpoint_key = f"{endpoint_info['method']} {endpoint_info['path']}"
-
-        if category not in captured_endpoints["endpoints"]:
-            captured_endpoints["endpoints"][category] = {}
-
-        # Store unique endpoint with latest data
-        captured_endpoints["endpoints"][category][endpoint_key] = {
-            "method": endpoint_info["method"],
-            "path": endpoint_info["path"],
-            "query_params": endpoint_info["query_params"],
-            "request_body_example": endpoint_info["request_body"],
-            "response_status": endpoint_info["response_status"],
-            "response_body_example": endpoint_info["response_body_preview"],
-            "last_seen": endpoint_info["timestamp"],
-        }
-
-        # Store raw request for reference
-        captured_endpoints["requests"].append(endpoint_info)
-
-        # Save to file
-        self.save()
-
-        # Log
+        cache_key = (endpoint_info["method"], endpoint_info["path"])
+        cached = self._key_cache.get(cache_key)
+        if cached is None:
+            cached = self._key_cache[cache_key] = (
+                categorize_endpoint(endpoint_info["path"], endpoint_info["method"]),
+                f"{endpoint_info['method']} {endpoint_info['path']}",
+            )
+        category, endpoint_key = cached
+
+        with self._lock:
+            # Store unique endpoint with latest data
+            endpoint_entries[(category, endpoint_key)] = EndpointEntry(
+                method=endpoint_info["method"],
+                path=endpoint_info["path"],
+                query_params=endpoint_info["query_params"],
+                request_body_example=endpoint_info["request_body"],
+                response_status=endpoint_info["response_status"],
+                response_body_example=endpoint_info["response_body_preview"],
+                last_seen=endpoint_info["timestamp"],
+            )
+
+            # Store raw request for reference
+            captured_endpoints["requests"].append(endpoint_info)
+
+        # Hand the raw trace to the writer thread (a copy, so the writer never
+        # sees a dict the hook is still allowed to touch)
+        self._queue.put(endpoint_info.copy())
+
+        # Log per-flow lines at debug only; surface a summary every 50 captures
         status = endpoint_info["response_status"] or "?"
-        ctx.log.info(f"[{self.request_count}] {endpoint_info['method']} {endpoint_info['path']} -> {status}")
-
-    def save(self) -> None:
-        """Save captured data to file"""
-        with open(self.output_file, "w") as f:
-            json.dump(captured_endpoints, f, indent=2, default=str)
+        ctx.log.debug(f"[{self.request_count}] {endpoint_info['method']} {endpoint_info['path']} -> {status}")
+        if self.request_count % 50 == 0:
+            ctx.log.info(f"captured {self.request_count} requests ({len(endpoint_entries)} unique endpoints)")
+
+    def save(self, pretty: bool = False) -> None:
+        """Save captured data to file (write to a tempfile, then atomic replace)
+
+        Periodic flushes stay compact; the indented form is reserved for the
+        final shutdown save, since nobody reads the raw file mid-capture.
+        """
+        tmp_file = self.output_file + ".tmp"
+        with self._lock:
+            endpoints_out: dict[str, dict[str, EndpointEntry]] = {}
+            for (category, endpoint_key), entry in endpoint_entries.items():
+                endpoints_out.setdefault(category, {})[endpoint_key] = entry
+            snapshot = {
+                **captured_endpoints,
+                "endpoints": endpoints_out,
+                "requests": list(captured_endpoints["requests"]),
+            }
+            payload = json_dumps(snapshot, indent=pretty)
+        Path(tmp_file).write_bytes(payload)
+        os.replace(tmp_file, self.output_file)
+
+
+# Maps every character a path can contain that is illegal in a TS identifier
+# to "_" in a single C-level translate call
+_TS_TRANS = str.maketrans({c: "_" for c in "/-.{}:?&="})
 
 
 def generate_typescript_client(endpoints_file: str) -> str:
     """Generate TypeScript client code from captured endpoints"""
-    with open(endpoints_file, "r") as f:
-        data = json.load(f)
+    with open(endpoints_file, "rb") as f:
+        data = json_loads(f.read())
 
-    ts_code = '''/**
+    # Accumulate snippets in a list and join once: O(N) in output size,
+    # unlike repeated str += which recopies the prefix on every append
+    parts: list[str] = ['''/**
  * Auto-generated Aura.build API Client
  * Generated from intercepted API calls
  */
@@ -214,27 +420,33 @@ export class AuraClient {
     });
   }
 
-'''
+''']
 
     # Generate methods for each endpoint
+    seen: dict[str, int] = {}
     for category, endpoints in data.get("endpoints", {}).items():
-        ts_code += f"  // {category.upper()}\n"
+        parts.append(f"  // {category.upper()}\n")
 
         for endpoint_key, endpoint in endpoints.items():
             method = endpoint["method"].lower()
             path = endpoint["path"]
-            func_name = path.replace("/", "_").replace("-", "_").strip("_")
-            func_name = f"{method}_{func_name}"
+            func_name = f"{method}_{path.translate(_TS_TRANS).strip('_')}"
+
+            # Suffix duplicates so colliding paths don't silently overwrite
+            count = seen.get(func_name, 0) + 1
+            seen[func_name] = count
+            if count > 1:
+                func_name = f"{func_name}_{count}"
 
-            ts_code += f"""
+            parts.append(f"""
   async {func_name}(params?: Record<string, unknown>): Promise<unknown> {{
     return this.client.{method}('{path}', params).then(r => r.data);
   }}
-"""
+""")
 
-    ts_code += "}\n"
+    parts.append("}\n")
 
-    return ts_code
+    return "".join(parts)
 
 
 def main():
@@ -281,6 +493,7 @@ def main():
         "-p", str(args.port),
         "--set", "block_global=false",
         "--set", "ssl_insecure=true",
+        "--set", "stream_large_bodies=1m",
     ]
 
     # Run with addon
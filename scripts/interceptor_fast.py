@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Hot-path string matching for the Aura.build API interceptor.
+
+These functions run once per proxied HTTP flow and are pure string work,
+so they live in their own module where they can optionally be AOT-compiled:
+
+  mypyc interceptor_fast.py        # or: cythonize -3 -i interceptor_fast.py
+
+api_interceptor.py imports them with a pure-Python fallback, so the
+compiled extension is a drop-in speedup, never a requirement.
+"""
+
+import functools
+import re
+
+# Target domains: aura.build and any subdomain (www, api, ...), compiled once
+# so the per-flow check is a single C-level regex match with no URL parsing
+_TARGET_RE = re.compile(r"^https?://(?:[^/]*\.)?aura\.build(?::\d+)?(?:/|$)")
+
+# Single compiled alternation: one C-level scan over the path, no lower()
+# allocation per keyword
+_CATEGORY_RE = re.compile(
+    r"/(auth|login|token|project|generate|ai|export|download"
+    r"|asset|upload|image|template|component|user|account)",
+    re.IGNORECASE,
+)
+_CATEGORY_MAP = {
+    "auth": "auth",
+    "login": "auth",
+    "token": "auth",
+    "project": "projects",
+    "generate": "generation",
+    "ai": "generation",
+    "export": "export",
+    "download": "export",
+    "asset": "assets",
+    "upload": "assets",
+    "image": "assets",
+    "template": "templates",
+    "component": "components",
+    "user": "users",
+    "account": "users",
+}
+
+
+def is_target_request(url: str) -> bool:
+    """Check if request is to aura.build domain"""
+    return _TARGET_RE.match(url) is not None
+
+
+@functools.lru_cache(maxsize=4096)
+def categorize_endpoint(path: str, method: str) -> str:
+    """Categorize endpoint based on path pattern"""
+    match = _CATEGORY_RE.search(path)
+    return _CATEGORY_MAP[match.group(1).lower()] if match else "other"